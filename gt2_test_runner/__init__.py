@@ -10,6 +10,7 @@ For per-test coverage result, the `coverage` module must be available.
 If the `colorama` module is available, test output will be colourised.
 """
 
+import copy
 import logging
 import os
 import time
@@ -174,7 +175,7 @@ class AutoDict(dict):
 
     def __getitem__(self, item):
         if item not in self:
-            self[item] = self.default_value
+            self[item] = copy.copy(self.default_value)
 
         return super(AutoDict, self).__getitem__(item)
 
@@ -210,9 +211,12 @@ class ColorizedTextTestResult(unittest.result.TestResult):
         self.rerun_log = None
 
         if COVERAGE_AVAILABLE and coverage_sources:
+            # Per-test data is fetched after every test, and a test not
+            # touching any of the sources would trigger a warning each time
             self.coverage = coverage.coverage(
                 branch=True,
                 include=coverage_sources)
+            self.coverage.set_option('run:disable_warnings', ['no-data-collected'])
 
         # Colours will only be applied if the colorama library is available
         try:
@@ -322,7 +326,7 @@ class ColorizedTextTestResult(unittest.result.TestResult):
 
         if self.coverage:
             self.coverage.stop()
-            self.test_data[test_fqn]['cov'] = self.coverage.data
+            self.test_data[test_fqn]['cov'] = self.coverage.get_data()
 
             if self.verbosity > 2:
                 self.stream.writeln('')
@@ -508,7 +512,141 @@ class ColorizedTextTestResult(unittest.result.TestResult):
         self.stream.writeln(self.separator2)
         self.stream.writeln(str("{}".format(err)))
 
-    def coverage_report(self, save_data=False, html_dir=None, to_stream=True):
+    @staticmethod
+    def _format_line_ranges(lines):
+        """Format a sorted list of line numbers as a compact range list
+
+        For example, ``[1, 2, 3, 7, 9, 10]`` becomes ``'1-3, 7, 9-10'``.
+        """
+
+        ranges = []
+
+        for line in lines:
+            if ranges and ranges[-1][1] == line - 1:
+                ranges[-1][1] = line
+            else:
+                ranges.append([line, line])
+
+        return ', '.join(str(start) if start == end else '{}-{}'.format(start, end)
+                         for start, end in ranges)
+
+    def _tests_by_line(self, changes):
+        """Index the per-test coverage data of newly covered lines
+
+        The per-test data is walked only once, so the cost doesn’t grow with
+        the number of changed lines times the number of tests.
+
+        :param changes: the differences returned by `coverage_diff`
+        :type changes: dict
+        :returns: a dictionary of file names mapped to a dictionary of newly
+            covered line numbers and the (sorted) list of tests executing them
+        :rtype: dict(str, dict(int, list(str)))
+        """
+
+        index = {filename: {} for filename in changes}
+
+        for test_fqn in sorted(self.test_data):
+            test_cov = self.test_data[test_fqn].get('cov')
+
+            if test_cov is None:
+                continue
+
+            for filename in index.keys() & set(test_cov.measured_files()):
+                covered = changes[filename][0]
+
+                for line in covered.intersection(test_cov.lines(filename)):
+                    index[filename].setdefault(line, []).append(test_fqn)
+
+        return index
+
+    def coverage_diff(self, baseline):
+        """Compare the overall coverage data with a saved baseline
+
+        Besides files with newly covered or uncovered lines, a file is also
+        considered changed if its branch coverage changed, or if its source
+        was modified after the baseline was saved.  For these, both sets of
+        line numbers may be empty.
+
+        :param baseline: the name of a data file saved by an earlier run
+            (usually .coverage)
+        :type baseline: str
+        :returns: a dictionary of file names whose coverage changed, mapped
+            to a tuple of newly covered and newly uncovered line numbers
+        :rtype: dict(str, tuple(set(int), set(int)))
+        """
+
+        baseline_data = coverage.CoverageData()
+        baseline_data.read_file(baseline)
+        baseline_mtime = os.path.getmtime(baseline)
+        current_data = self.coverage_data.get_data()
+
+        changes = {}
+
+        for filename in set(baseline_data.measured_files()) | \
+                set(current_data.measured_files()):
+            old_lines = set(baseline_data.lines(filename) or [])
+            new_lines = set(current_data.lines(filename) or [])
+
+            if old_lines != new_lines or \
+               set(baseline_data.arcs(filename) or []) != set(current_data.arcs(filename) or []) or \
+               (os.path.exists(filename) and os.path.getmtime(filename) > baseline_mtime):
+                changes[filename] = (new_lines - old_lines, old_lines - new_lines)
+
+        return changes
+
+    def print_coverage_diff(self, changes):
+        """Print the differences returned by `coverage_diff`
+
+        Newly covered lines are prefixed with ``+`` and followed by the
+        name of the tests covering them; newly uncovered lines are prefixed
+        with ``-``.  Files where only the branch coverage or the source
+        changed are marked with ``~``.
+        """
+
+        print('\nCoverage changes since baseline', file=self.stream)
+        print('===============================\n', file=self.stream)
+
+        if not changes:
+            print('No changes.', file=self.stream)
+
+            return
+
+        tests_by_line = self._tests_by_line(changes)
+
+        for filename in sorted(changes):
+            covered, uncovered = changes[filename]
+            covering = tests_by_line[filename]
+
+            print(filename, file=self.stream)
+
+            if not covered and not uncovered:
+                print('  ~ branch coverage or source changed', file=self.stream)
+
+                continue
+
+            # Group consecutive lines that are covered by the same tests, so
+            # a block of newly covered code is reported only once
+            groups = []
+
+            for line in sorted(covered):
+                tests = tuple(covering.get(line, ()))
+
+                if groups and groups[-1][0] == tests and groups[-1][1][-1] == line - 1:
+                    groups[-1][1].append(line)
+                else:
+                    groups.append((tests, [line]))
+
+            for tests, lines in groups:
+                print('  + {lines} ({tests})'.format(
+                    lines=self._format_line_ranges(lines),
+                    tests=', '.join(tests) or 'no test data'), file=self.stream)
+
+            if uncovered:
+                print('  - {}'.format(self._format_line_ranges(sorted(uncovered))),
+                      file=self.stream)
+
+    def coverage_report(self, save_data=False, html_dir=None, to_stream=True,
+                        baseline=None):
         """Report coverage data
 
         :param save_data: if `True`, save coverage data to the .coverage file
@@ -518,6 +656,12 @@ class ColorizedTextTestResult(unittest.result.TestResult):
         :type html_dir: None, str
         :param to_stream: if `True`, write coverage data to the output stream
         :type to_stream: bool
+        :param baseline: If not `None`, compare coverage data with this data
+            file saved by an earlier run, and write the changed lines to the
+            output stream.  If nothing changed since the HTML report was
+            built, it is not regenerated.  If the file doesn’t exist yet,
+            the full HTML report is generated.
+        :type baseline: None, str
         """
 
         # Return silently if the Coverage package is not available, or
@@ -538,15 +682,45 @@ class ColorizedTextTestResult(unittest.result.TestResult):
             print('=======================\n', file=self.stream)
             cov.report(file=self.stream)
 
+        # The baseline must be read before saving, as it is usually the same
+        # file we are about to overwrite
+        changes = None
+
+        if baseline and os.path.exists(baseline):
+            changes = self.coverage_diff(baseline)
+
+            if to_stream:
+                self.print_coverage_diff(changes)
+
         if save_data:
             cov.save()
 
-        if html_dir:
+        if not html_dir:
+            return
+
+        # The data the HTML report was built from is saved next to it, as the
+        # report might have been built from data other than the baseline
+        # (e.g. when `save_data` is `False`).
+        #
+        # coverage’s own HTML writer keeps a hash of each file’s source and
+        # data, and only rewrites the pages of files that changed; the index
+        # is always built from the full data.  We can skip it entirely if
+        # nothing changed since the report was built.
+        html_data = os.path.join(html_dir, '.gt2_coverage')
+
+        if changes is None or \
+           not os.path.exists(os.path.join(html_dir, 'index.html')) or \
+           not os.path.exists(html_data) or \
+           self.coverage_diff(html_data):
             cov.html_report(directory=html_dir)
+            cov.get_data().write_file(html_data)
 
             print('\nHTML coverage data is saved as file://{}/index.html'.format(html_dir),
                   file=self.stream)
-
+        elif to_stream:
+            print('\nCoverage did not change, HTML coverage data at file://{}/index.html '
+                  'is up to date'.format(html_dir),
+                  file=self.stream)
 
 class GT2Runner(unittest.TextTestRunner):
     """Test runner with colourised output and per-test coverage support
@@ -1,8 +1,45 @@
+from contextlib import redirect_stderr
 from io import StringIO
+import importlib.util
+import os
+import re
+import shutil
 import sys
+import tempfile
 import unittest
 
-from gt2_test_runner import GT2Runner
+from gt2_test_runner import AutoDict, ColorizedTextTestResult, COVERAGE_AVAILABLE, GT2Runner
+
+SAMPLE_SOURCE = '''def branch(value):
+    result = 0
+    if value:
+        result = 1
+    return result
+
+
+def other():
+    return 2
+'''
+
+
+def _sample_test_case(sample):
+    """Create a test case calling the functions of the sample module
+    """
+
+    class SampleTestCase(unittest.TestCase):
+        def test_true(self):
+            sample.branch(True)
+
+        def test_false(self):
+            sample.branch(False)
+
+        def test_other(self):
+            sample.other()
+
+        def test_nothing(self):
+            pass
+
+    return SampleTestCase
 
 
 class TestTestCase(unittest.TestCase):
@@ -64,12 +101,174 @@ class RunnerTestCase(unittest.TestCase):
         self.assertEqual(1, len(result.unexpectedSuccesses))
 
 
+class HelperTestCase(unittest.TestCase):
+    def test_autodict_default_not_shared(self):
+        data = AutoDict(default_value={})
+        data['first']['value'] = 1
+        data['second']['value'] = 2
+
+        self.assertEqual(1, data['first']['value'])
+        self.assertEqual(2, data['second']['value'])
+
+    def test_format_line_ranges(self):
+        self.assertEqual('1-3, 7, 9-10',
+                         ColorizedTextTestResult._format_line_ranges([1, 2, 3, 7, 9, 10]))
+        self.assertEqual('', ColorizedTextTestResult._format_line_ranges([]))
+
+
+@unittest.skipUnless(COVERAGE_AVAILABLE, 'The coverage package is not available')
+class CoverageDiffTestCase(unittest.TestCase):
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmp_dir = os.path.realpath(tempfile.mkdtemp())
+        os.chdir(self.tmp_dir)
+
+        self.sample = os.path.join(self.tmp_dir, 'sample.py')
+
+        with open(self.sample, 'w') as sample_file:
+            sample_file.write(SAMPLE_SOURCE)
+
+        # Make sure the source is older than any baseline we save
+        os.utime(self.sample, (1000000000, 1000000000))
+
+        spec = importlib.util.spec_from_file_location('gt2_sample', self.sample)
+        sample = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sample)
+
+        self.test_case = _sample_test_case(sample)
+        self.output = StringIO()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def _fqn(self, test_name):
+        return '.'.join((self.test_case.__module__, self.test_case.__name__, test_name))
+
+    def _run(self, *test_names):
+        runner = GT2Runner(verbosity=1, stream=self.output, coverage_sources=[self.sample])
+
+        return runner.run(unittest.TestSuite(self.test_case(test_name)
+                                             for test_name in test_names))
+
+    def _report(self, result, **kwargs):
+        """Call `coverage_report`, and return only what it wrote to the stream
+        """
+
+        start = len(self.output.getvalue())
+        result.coverage_report(**kwargs)
+
+        return self.output.getvalue()[start:]
+
+    def _html_coverage(self):
+        with open(os.path.join('htmlcov', 'index.html')) as index_file:
+            return re.search(r'<span class="pc_cov">(\d+%)</span>', index_file.read()).group(1)
+
+    def test_per_test_data(self):
+        stderr = StringIO()
+
+        with redirect_stderr(stderr):
+            result = self._run('test_true', 'test_nothing')
+
+        self.assertEqual([1, 2, 3, 4, 5],
+                         sorted(result.test_data[self._fqn('test_true')]['cov'].lines(self.sample)))
+        self.assertFalse(result.test_data[self._fqn('test_nothing')]['cov'].lines(self.sample))
+        self.assertEqual('', stderr.getvalue())
+
+    def test_missing_baseline(self):
+        output = self._report(self._run('test_true'),
+                              save_data=True, html_dir='htmlcov', baseline='.coverage')
+
+        self.assertNotIn('Coverage changes since baseline', output)
+        self.assertIn('HTML coverage data is saved', output)
+        self.assertTrue(os.path.exists(os.path.join('htmlcov', 'index.html')))
+        self.assertTrue(os.path.exists('.coverage'))
+
+    def test_unchanged(self):
+        self._report(self._run('test_true'), save_data=True, html_dir='htmlcov')
+
+        result = self._run('test_true')
+        output = self._report(result, html_dir='htmlcov', baseline='.coverage')
+
+        self.assertEqual({}, result.coverage_diff('.coverage'))
+        self.assertIn('No changes.', output)
+        self.assertIn('is up to date', output)
+
+    def test_unchanged_without_stream(self):
+        self._report(self._run('test_true'), save_data=True, html_dir='htmlcov')
+
+        output = self._report(self._run('test_true'),
+                              html_dir='htmlcov', baseline='.coverage', to_stream=False)
+
+        self.assertEqual('', output)
+
+    def test_report_built_from_other_data(self):
+        self._report(self._run('test_true', 'test_other'), save_data=True, html_dir='htmlcov')
+        full_coverage = self._html_coverage()
+
+        # Report different data without saving it as the new baseline
+        self._report(self._run('test_other'), html_dir='htmlcov', baseline='.coverage')
+        self.assertNotEqual(full_coverage, self._html_coverage())
+
+        # Coverage is the same as the baseline, but not as the HTML report
+        output = self._report(self._run('test_true', 'test_other'),
+                              html_dir='htmlcov', baseline='.coverage')
+
+        self.assertIn('No changes.', output)
+        self.assertIn('HTML coverage data is saved', output)
+        self.assertEqual(full_coverage, self._html_coverage())
+
+    def test_changed(self):
+        self._report(self._run('test_true', 'test_other'), save_data=True, html_dir='htmlcov')
+
+        result = self._run('test_true', 'test_false')
+        output = self._report(result, html_dir='htmlcov', baseline='.coverage')
+
+        self.assertEqual({self.sample: (set(), {8, 9})}, result.coverage_diff('.coverage'))
+        self.assertIn(self.sample + '\n  - 8-9\n', output)
+        self.assertIn('HTML coverage data is saved', output)
+
+    def test_covering_tests(self):
+        self._report(self._run('test_other'), save_data=True)
+
+        output = self._report(self._run('test_true', 'test_false', 'test_other'),
+                              baseline='.coverage')
+
+        self.assertIn('\n'.join((self.sample,
+                                 '  + 1-3 ({}, {})'.format(self._fqn('test_false'),
+                                                           self._fqn('test_true')),
+                                 '  + 4 ({})'.format(self._fqn('test_true')),
+                                 '  + 5 ({}, {})'.format(self._fqn('test_false'),
+                                                         self._fqn('test_true')))),
+                      output)
+
+    def test_branch_change(self):
+        self._report(self._run('test_true'), save_data=True)
+
+        result = self._run('test_true', 'test_false')
+
+        self.assertEqual({self.sample: (set(), set())}, result.coverage_diff('.coverage'))
+        self.assertIn('  ~ branch coverage or source changed',
+                      self._report(result, baseline='.coverage'))
+
+    def test_source_change(self):
+        self._report(self._run('test_true'), save_data=True)
+        os.utime('.coverage', (1500000000, 1500000000))
+        os.utime(self.sample, None)
+
+        result = self._run('test_true')
+
+        self.assertEqual({self.sample: (set(), set())}, result.coverage_diff('.coverage'))
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner()
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
 
     suite.addTest(loader.loadTestsFromTestCase(RunnerTestCase))
+    suite.addTest(loader.loadTestsFromTestCase(HelperTestCase))
+    suite.addTest(loader.loadTestsFromTestCase(CoverageDiffTestCase))
 
     result = runner.run(suite)
 